@@ -1,17 +1,32 @@
 #!/usr/bin/env python3
 import sys
 import os
+import socket
 import socketserver
 import http.server
 import threading
+import json
+import math
+import datetime
+import email.utils
 import yaml
+from array import array
+
+# Prefer the libyaml-backed C loader/dumper; fall back to pure Python if unavailable.
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
 
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QHBoxLayout, QVBoxLayout,
-    QListWidget, QPushButton, QFileDialog, QComboBox, QTextEdit,
+    QListView, QPushButton, QFileDialog, QComboBox, QTextEdit,
     QDialog, QDialogButtonBox, QLabel
 )
-from PyQt5.QtCore import QUrl, QObject, pyqtSlot, pyqtSignal, Qt
+from PyQt5.QtCore import (
+    QUrl, QObject, pyqtSlot, pyqtSignal, Qt, QAbstractListModel, QModelIndex,
+    QRunnable, QThreadPool
+)
 from PyQt5.QtWebEngineWidgets import QWebEngineView
 from PyQt5.QtWebChannel import QWebChannel
 
@@ -21,18 +36,230 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 class CustomRequestHandler(http.server.SimpleHTTPRequestHandler):
     """Serve files from BASE_DIR on localhost:PORT."""
-    def translate_path(self, path):
-        new_path = http.server.SimpleHTTPRequestHandler.translate_path(self, path)
-        rel_path = os.path.relpath(new_path, os.getcwd())
-        return os.path.join(BASE_DIR, rel_path)
+    def __init__(self, *args, **kwargs):
+        # Passing the directory up front avoids resolving the cwd on every request.
+        super().__init__(*args, directory=BASE_DIR, **kwargs)
+
+    def setup(self):
+        super().setup()
+        # Responses are small; don't let Nagle's algorithm hold them back.
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def send_head(self):
+        # Serve a precompressed <file>.gz when the client accepts gzip and the
+        # .gz is at least as new as the file (so an edited map_view.html is never shadowed).
+        path = self.translate_path(self.path)
+        gz_path = path + ".gz"
+        # Any response for a file with a .gz sibling depends on Accept-Encoding,
+        # whichever body is sent; end_headers adds the Vary header.
+        self.vary_encoding = os.path.isfile(path) and os.path.isfile(gz_path)
+        if (self.vary_encoding and self.accepts_gzip()
+                and os.path.getmtime(gz_path) >= os.path.getmtime(path)):
+            if self.not_modified_since(os.path.getmtime(gz_path)):
+                self.send_response(304)
+                self.end_headers()
+                return None
+            f = open(gz_path, 'rb')
+            try:
+                fs = os.fstat(f.fileno())
+                self.send_response(200)
+                self.send_header("Content-type", self.guess_type(path))
+                self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(fs.st_size))
+                self.send_header("Last-Modified", self.date_time_string(fs.st_mtime))
+                self.end_headers()
+                return f
+            except:
+                f.close()
+                raise
+        return super().send_head()
+
+    def end_headers(self):
+        if getattr(self, "vary_encoding", False):
+            self.send_header("Vary", "Accept-Encoding")
+        super().end_headers()
+
+    def accepts_gzip(self):
+        """Whether Accept-Encoding allows gzip (an explicit or wildcard entry with q > 0)."""
+        qvalues = {}
+        for entry in self.headers.get("Accept-Encoding", "").split(","):
+            coding, _, params = entry.partition(";")
+            q = 1.0
+            for param in params.split(";"):
+                name, _, value = param.partition("=")
+                if name.strip().lower() == "q":
+                    try:
+                        q = float(value)
+                    except ValueError:
+                        q = 0.0
+            qvalues[coding.strip().lower()] = q
+        return qvalues.get("gzip", qvalues.get("*", 0.0)) > 0
+
+    def not_modified_since(self, mtime):
+        """Same If-Modified-Since check as SimpleHTTPRequestHandler.send_head."""
+        if "If-Modified-Since" not in self.headers or "If-None-Match" in self.headers:
+            return False
+        try:
+            ims = email.utils.parsedate_to_datetime(self.headers["If-Modified-Since"])
+        except (TypeError, IndexError, OverflowError, ValueError):
+            return False
+        if ims.tzinfo is None:
+            ims = ims.replace(tzinfo=datetime.timezone.utc)
+        if ims.tzinfo is not datetime.timezone.utc:
+            return False
+        last_modif = datetime.datetime.fromtimestamp(mtime, datetime.timezone.utc)
+        return last_modif.replace(microsecond=0) <= ims
+
+    def copyfile(self, source, outputfile):
+        # Let the kernel send the file straight to the socket (os.sendfile where available).
+        if outputfile is self.wfile:
+            self.connection.sendfile(source)
+        else:
+            super().copyfile(source, outputfile)
+
+class LocalHTTPServer(socketserver.ThreadingTCPServer):
+    """Threaded server so the page's assets are fetched concurrently."""
+    allow_reuse_address = True
+    daemon_threads = True
 
 def start_local_server():
     """Starts an HTTP server in a background thread."""
-    os.chdir(BASE_DIR)
-    with socketserver.TCPServer(("", PORT), CustomRequestHandler) as httpd:
+    with LocalHTTPServer(("", PORT), CustomRequestHandler) as httpd:
         print(f"Serving at http://127.0.0.1:{PORT}")
         httpd.serve_forever()
 
+# ---------- Route data ----------
+def new_route(route_id, color):
+    """Create an empty route.
+
+    Points are stored as parallel arrays (marker ids, latitudes, longitudes)
+    rather than a list of tuples, which keeps them compact and unboxed.
+    'index' maps a marker id to its position in those arrays.
+    """
+    return {'id': route_id, 'color': color,
+            'ids': array('i'), 'lat': array('d'), 'lng': array('d'), 'index': {}}
+
+def append_point(route, marker_id, lat, lng):
+    """Append a point to the end of a route."""
+    route['index'][marker_id] = len(route['ids'])
+    route['ids'].append(marker_id)
+    route['lat'].append(lat)
+    route['lng'].append(lng)
+
+def validate_routes(routes):
+    """Raise ValueError unless routes is a list of routes as read by addRouteFromData."""
+    if not isinstance(routes, list):
+        raise ValueError("routes must be a list")
+    for route in routes:
+        if not isinstance(route, dict):
+            raise ValueError(f"route must be a mapping, got {route!r}")
+        if not isinstance(route.get("color", ""), str):
+            raise ValueError(f"route color must be a string, got {route['color']!r}")
+        points = route.get("points", route.get("global_route", []))
+        if not isinstance(points, list):
+            raise ValueError("route points must be a list")
+        for point in points:
+            if not isinstance(point, dict):
+                raise ValueError(f"point must be a mapping, got {point!r}")
+            for key in ("lat", "lon", "lng"):
+                value = point.get(key)
+                if value is None:
+                    continue
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    raise ValueError(f"point {key} must be a number, got {value!r}")
+                # Points are stored as doubles and sent to the map as JSON, so they must
+                # convert to a finite float.
+                try:
+                    finite = math.isfinite(float(value))
+                except OverflowError:
+                    finite = False
+                if not finite:
+                    raise ValueError(f"point {key} must be a finite number, got {value!r}")
+
+# ---------- List model for the points of all routes ----------
+class RoutesModel(QAbstractListModel):
+    """One row per point, grouped by route, rendered on demand from the route arrays.
+
+    All changes to the points of a route must go through this model so that
+    attached views are notified.
+    """
+    # Text of a point's row.
+    _POINT_LABEL = "Route {}: {:.6f}, {:.6f} [ID:{}]".format
+
+    def __init__(self, routes, parent=None):
+        super().__init__(parent)
+        self.routes = routes
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return sum(len(route['ids']) for route in self.routes.values())
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        route_id, i = self.locate(index.row())
+        if route_id is None:
+            return None
+        route = self.routes[route_id]
+        return self._POINT_LABEL(route_id, route['lat'][i], route['lng'][i], route['ids'][i])
+
+    def locate(self, row):
+        """Return (route_id, position in the route) for a row, or (None, None)."""
+        for route_id, route in self.routes.items():
+            if row < len(route['ids']):
+                return route_id, row
+            row -= len(route['ids'])
+        return None, None
+
+    def firstRow(self, route_id):
+        """Row of the first point of a route."""
+        row = 0
+        for rid, route in self.routes.items():
+            if rid == route_id:
+                break
+            row += len(route['ids'])
+        return row
+
+    def addPoints(self, route_id, points):
+        """Append (marker_id, lat, lng) points to a route."""
+        if not points:
+            return
+        route = self.routes[route_id]
+        row = self.firstRow(route_id) + len(route['ids'])
+        self.beginInsertRows(QModelIndex(), row, row + len(points) - 1)
+        for marker_id, lat, lng in points:
+            append_point(route, marker_id, lat, lng)
+        self.endInsertRows()
+
+    def movePoint(self, route_id, marker_id, lat, lng):
+        """Update the position of a marker, if the route has it."""
+        route = self.routes[route_id]
+        i = route['index'].get(marker_id)
+        if i is None:
+            return
+        route['lat'][i] = lat
+        route['lng'][i] = lng
+        index = self.index(self.firstRow(route_id) + i)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+    def clearRoute(self, route_id):
+        """Remove all points of a route, keeping its color."""
+        route = self.routes[route_id]
+        count = len(route['ids'])
+        if count:
+            row = self.firstRow(route_id)
+            self.beginRemoveRows(QModelIndex(), row, row + count - 1)
+        self.routes[route_id] = new_route(route_id, route['color'])
+        if count:
+            self.endRemoveRows()
+
+    def clear(self):
+        """Remove all routes."""
+        self.beginResetModel()
+        self.routes.clear()
+        self.endResetModel()
+
 # ---------- JS <-> Python Bridge ----------
 class Bridge(QObject):
     # Now sending four parameters: lat, lng, marker_id, and route_id.
@@ -47,6 +274,45 @@ class Bridge(QObject):
     def markerMoved(self, lat, lng, marker_id, route_id):
         self.markerMovedSignal.emit(lat, lng, marker_id, route_id)
 
+# ---------- Background YAML file I/O ----------
+class YamlTaskSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+class YamlLoadTask(QRunnable):
+    """Parse a YAML file on a worker thread; emits the parsed data."""
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.signals = YamlTaskSignals()
+
+    def run(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = yaml.load(f, Loader=SafeLoader)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(data)
+
+class YamlSaveTask(QRunnable):
+    """Write data to a YAML file on a worker thread; emits (message, file path)."""
+    def __init__(self, path, data, message):
+        super().__init__()
+        self.path = path
+        self.data = data
+        self.message = message
+        self.signals = YamlTaskSignals()
+
+    def run(self):
+        try:
+            with open(self.path, "w") as f:
+                yaml.dump(self.data, f, Dumper=SafeDumper, default_flow_style=False)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit((self.message, self.path))
+
 # ---------- Dialog for pasting YAML text ----------
 class YamlTextDialog(QDialog):
     def __init__(self, parent=None):
@@ -68,6 +334,12 @@ class YamlTextDialog(QDialog):
 
 # ---------- Main Window ----------
 class MapPointSelector(QMainWindow):
+    # JS snippets run on the map page.
+    _SET_ROUTE_JS = "setCurrentRoute({});".format
+    _ADD_ROUTE_JS = "addRoute({}, '{}');".format
+    _ADD_MARKERS_JS = "addMarkersToRoute({}, {});".format
+    _CLEAR_ROUTE_JS = "clearCurrentRoute({});".format
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Map Point Selector")
@@ -75,14 +347,14 @@ class MapPointSelector(QMainWindow):
         self.setAcceptDrops(True)  # Enable drag-and-drop
 
         # Data model: routes dictionary.
-        # Each route is a dict with keys: id, color, and points (a list of (marker_id, lat, lng)).
+        # Each route is a dict with keys: id, color, the parallel arrays ids, lat and lng, and index (see new_route).
         self.routes = {}
         self.currentRouteId = 0
         self.nextRouteId = 1  # Used for creating new routes
         self.colors = ["red", "blue", "green", "orange", "purple", "cyan", "magenta"]
 
         # Create a default route (ID 0)
-        self.routes[self.currentRouteId] = {'id': self.currentRouteId, 'color': self.colors[0], 'points': []}
+        self.routes[self.currentRouteId] = new_route(self.currentRouteId, self.colors[0])
 
         # Main layout
         central_widget = QWidget()
@@ -118,9 +390,12 @@ class MapPointSelector(QMainWindow):
         btn_clear_all.clicked.connect(self.clearAll)
         right_layout.addWidget(btn_clear_all)
 
-        # List widget to display points.
-        self.listWidget = QListWidget()
-        right_layout.addWidget(self.listWidget, stretch=1)
+        # List view to display points; rows are rendered from self.routes by the model.
+        self.pointsModel = RoutesModel(self.routes, self)
+        self.listView = QListView()
+        self.listView.setUniformItemSizes(True)
+        self.listView.setModel(self.pointsModel)
+        right_layout.addWidget(self.listView, stretch=1)
 
         # Button to save all routes (multi–route format).
         btn_save = QPushButton("Save YAML")
@@ -151,7 +426,8 @@ class MapPointSelector(QMainWindow):
         self.channel = QWebChannel()
         self.bridge = Bridge()
         self.channel.registerObject("bridge", self.bridge)
-        self.webview.page().setWebChannel(self.channel)
+        self._page = self.webview.page()
+        self._page.setWebChannel(self.channel)
 
         self.bridge.pointAddedSignal.connect(self.onPointAdded)
         self.bridge.markerMovedSignal.connect(self.onMarkerMoved)
@@ -161,8 +437,8 @@ class MapPointSelector(QMainWindow):
         self.webview.load(url)
 
         # Once the page loads, tell the JS side the current route and create the default route.
-        self.webview.page().runJavaScript(f"setCurrentRoute({self.currentRouteId});")
-        self.webview.page().runJavaScript(f"addRoute({self.currentRouteId}, '{self.routes[self.currentRouteId]['color']}');")
+        self._page.runJavaScript(self._SET_ROUTE_JS(self.currentRouteId))
+        self._page.runJavaScript(self._ADD_ROUTE_JS(self.currentRouteId, self.routes[self.currentRouteId]['color']))
 
     # ---------- Drag and Drop support for YAML files ----------
     def dragEnterEvent(self, event):
@@ -174,9 +450,7 @@ class MapPointSelector(QMainWindow):
         for url in event.mimeData().urls():
             file_path = url.toLocalFile()
             if file_path.lower().endswith((".yaml", ".yml")):
-                with open(file_path, 'r') as f:
-                    content = f.read()
-                    self.loadYamlContent(content)
+                self.loadYamlFile(file_path)
                 break
 
     def loadYamlFromText(self):
@@ -188,32 +462,60 @@ class MapPointSelector(QMainWindow):
     def loadYamlFromFile(self):
         filename, _ = QFileDialog.getOpenFileName(self, "Open YAML File", "", "YAML Files (*.yaml *.yml)")
         if filename:
-            with open(filename, 'r') as f:
-                content = f.read()
-            self.loadYamlContent(content)
+            self.loadYamlFile(filename)
+
+    def loadYamlFile(self, filename):
+        """Parse a YAML file in the background and load its routes when done."""
+        task = YamlLoadTask(filename)
+        task.signals.finished.connect(self.loadYamlData)
+        task.signals.failed.connect(self.onYamlLoadFailed)
+        QThreadPool.globalInstance().start(task)
+
+    @pyqtSlot(str)
+    def onYamlLoadFailed(self, error):
+        print("Failed to parse YAML:", error)
 
     def loadYamlContent(self, content):
+        """Parse YAML text and load the routes it contains."""
         try:
-            data = yaml.safe_load(content)
+            data = yaml.load(content, Loader=SafeLoader)
         except Exception as e:
-            print("Failed to parse YAML:", e)
+            self.onYamlLoadFailed(str(e))
             return
+        self.loadYamlData(data)
 
+    @pyqtSlot(object)
+    def loadYamlData(self, data):
+        """Load routes from already parsed YAML data."""
+        if not isinstance(data, dict):
+            print("Invalid YAML format")
+            return
         # Check if the YAML contains multiple routes or a single route.
         if "routes" in data:
             routes = data["routes"]
-            for route in routes:
-                self.addRouteFromData(route)
         elif "global_route" in data:
             # If only a single route was saved (using the older format), wrap it as one route.
-            route_data = {
+            routes = [{
                 "id": self.nextRouteId,
                 "color": self.colors[self.nextRouteId % len(self.colors)],
                 "points": data["global_route"]
-            }
-            self.addRouteFromData(route_data)
+            }]
         else:
             print("Invalid YAML format")
+            return
+        # Validate everything up front so a bad file never leaves a half-loaded route behind.
+        try:
+            validate_routes(routes)
+        except ValueError as e:
+            print("Invalid YAML format:", e)
+            return
+        # Don't fire changeRoute for every route added to the combo box.
+        self.routeComboBox.blockSignals(True)
+        try:
+            for route in routes:
+                self.addRouteFromData(route)
+        finally:
+            self.routeComboBox.blockSignals(False)
 
     def addRouteFromData(self, route_data):
         # Create a new route using our nextRouteId (ignoring any route id in the file).
@@ -222,91 +524,81 @@ class MapPointSelector(QMainWindow):
         color = route_data.get("color", self.colors[route_id % len(self.colors)])
         points = route_data.get("points", route_data.get("global_route", []))
         # Store the new route in our data model.
-        self.routes[route_id] = {'id': route_id, 'color': color, 'points': []}
+        self.routes[route_id] = new_route(route_id, color)
         # Add it to the route selection combo box.
         self.routeComboBox.addItem(f"Route {route_id} ({color})", route_id)
         # Instruct the JS side to create the route.
-        self.webview.page().runJavaScript(f"addRoute({route_id}, '{color}');")
+        self._page.runJavaScript(self._ADD_ROUTE_JS(route_id, color))
         # Add each point from the YAML file.
+        markers = []
         for point in points:
             lat = point.get("lat")
             # Allow either "lon" or "lng"
             lng = point.get("lon") or point.get("lng")
             if lat is not None and lng is not None:
-                marker_id = len(self.routes[route_id]['points'])
-                self.routes[route_id]['points'].append((marker_id, lat, lng))
-                self.webview.page().runJavaScript(f"addMarkerToRoute({route_id}, {marker_id}, {lat}, {lng});")
-                self.listWidget.addItem(f"Route {route_id}: {lat:.6f}, {lng:.6f} [ID:{marker_id}]")
+                markers.append([len(markers), lat, lng])
+        # Insert all points in one batch and send them to JS in a single call.
+        if markers:
+            self.pointsModel.addPoints(route_id, markers)
+            self._page.runJavaScript(self._ADD_MARKERS_JS(route_id, json.dumps(markers)))
 
     def newRoute(self):
         # Create a new route.
         route_id = self.nextRouteId
         self.nextRouteId += 1
         color = self.colors[route_id % len(self.colors)]
-        self.routes[route_id] = {'id': route_id, 'color': color, 'points': []}
+        self.routes[route_id] = new_route(route_id, color)
         self.routeComboBox.addItem(f"Route {route_id} ({color})", route_id)
         # Switch to the new route.
         index = self.routeComboBox.count() - 1
         self.routeComboBox.setCurrentIndex(index)
-        self.webview.page().runJavaScript(f"addRoute({route_id}, '{color}');")
-        self.webview.page().runJavaScript(f"setCurrentRoute({route_id});")
+        self._page.runJavaScript(self._ADD_ROUTE_JS(route_id, color))
+        self._page.runJavaScript(self._SET_ROUTE_JS(route_id))
 
     def changeRoute(self, index):
         # Change the active route.
         route_id = self.routeComboBox.itemData(index)
         if route_id is not None:
             self.currentRouteId = route_id
-            self.webview.page().runJavaScript(f"setCurrentRoute({route_id});")
+            self._page.runJavaScript(self._SET_ROUTE_JS(route_id))
 
     @pyqtSlot(float, float, int, int)
     def onPointAdded(self, lat, lng, marker_id, route_id):
         # Called when JS notifies us of a new marker.
         if route_id not in self.routes:
             route_id = self.currentRouteId
-        self.routes[route_id]['points'].append((marker_id, lat, lng))
-        self.listWidget.addItem(f"Route {route_id}: {lat:.6f}, {lng:.6f} [ID:{marker_id}]")
+        self.pointsModel.addPoints(route_id, [(marker_id, lat, lng)])
 
     @pyqtSlot(float, float, int, int)
     def onMarkerMoved(self, lat, lng, marker_id, route_id):
         # Called when a marker is moved (dragged) in JS.
         if route_id in self.routes:
-            points = self.routes[route_id]['points']
-            for i, (mid, old_lat, old_lng) in enumerate(points):
-                if mid == marker_id:
-                    points[i] = (mid, lat, lng)
-                    self.listWidget.addItem(f"Route {route_id}: Marker {marker_id} moved to {lat:.6f}, {lng:.6f}")
-                    break
+            self.pointsModel.movePoint(route_id, marker_id, lat, lng)
 
     def clearCurrentRoute(self):
         """Remove only the markers and polyline for the current route and clear its data."""
         # Instruct JS to clear markers for the current route.
-        self.webview.page().runJavaScript(f"clearCurrentRoute({self.currentRouteId});")
-        # Clear the data for the current route.
+        self._page.runJavaScript(self._CLEAR_ROUTE_JS(self.currentRouteId))
+        # Clear the data (and list rows) for the current route.
         if self.currentRouteId in self.routes:
-            self.routes[self.currentRouteId]['points'].clear()
-        # Remove listWidget items corresponding to the current route.
-        for i in range(self.listWidget.count()-1, -1, -1):
-            item = self.listWidget.item(i)
-            if item.text().startswith(f"Route {self.currentRouteId}:"):
-                self.listWidget.takeItem(i)
+            self.pointsModel.clearRoute(self.currentRouteId)
 
     def clearAll(self):
         """Remove all routes (markers, polylines) from the JS side and reset the data model."""
         # Tell JS to clear everything.
-        self.webview.page().runJavaScript("clearAllRoutes();")
+        self._page.runJavaScript("clearAllRoutes();")
         # Clear local data.
-        self.routes.clear()
-        self.listWidget.clear()
+        self.pointsModel.clear()
         self.routeComboBox.clear()
         # Reinitialize with a default route (ID 0).
         self.currentRouteId = 0
         self.nextRouteId = 1
         default_color = self.colors[0]
-        self.routes[self.currentRouteId] = {'id': self.currentRouteId, 'color': default_color, 'points': []}
+        self.routes[self.currentRouteId] = new_route(self.currentRouteId, default_color)
         self.routeComboBox.addItem(f"Route {self.currentRouteId} ({default_color})", self.currentRouteId)
         # Instruct JS to add the default route.
-        self.webview.page().runJavaScript(f"addRoute({self.currentRouteId}, '{default_color}');")
-        self.webview.page().runJavaScript(f"setCurrentRoute({self.currentRouteId});")
+        self._page.runJavaScript(self._ADD_ROUTE_JS(self.currentRouteId, default_color))
+        self._page.runJavaScript(self._SET_ROUTE_JS(self.currentRouteId))
 
     def saveYaml(self):
         """Save all routes (multi–route format) to a YAML file."""
@@ -315,30 +607,43 @@ class MapPointSelector(QMainWindow):
 
         data = {"routes": []}
         for route_id, route in self.routes.items():
-            points_list = [{"lat": lat, "lon": lng} for (marker_id, lat, lng) in route['points']]
+            points_list = [{"lat": lat, "lon": lng} for lat, lng in zip(route['lat'].tolist(), route['lng'].tolist())]
             data["routes"].append({"id": route_id, "color": route['color'], "points": points_list})
         filename, _ = QFileDialog.getSaveFileName(self, "Save YAML", "routes.yaml", "YAML Files (*.yaml)")
         if filename:
-            with open(filename, "w") as f:
-                yaml.dump(data, f, default_flow_style=False)
-            print("Saved:", filename)
+            self.saveYamlFile(filename, data, "Saved:")
 
     def saveCurrentPath(self):
         """Save only the current route (in the original format) to a YAML file."""
-        if self.currentRouteId not in self.routes or not self.routes[self.currentRouteId]['points']:
+        if self.currentRouteId not in self.routes or not self.routes[self.currentRouteId]['ids']:
             return
+        route = self.routes[self.currentRouteId]
         data = {"global_route": []}
-        for marker_id, lat, lng in self.routes[self.currentRouteId]['points']:
+        for lat, lng in zip(route['lat'].tolist(), route['lng'].tolist()):
             data["global_route"].append({"lat": lat, "lon": lng})
         filename, _ = QFileDialog.getSaveFileName(self, "Save Current Path", "route.yaml", "YAML Files (*.yaml)")
         if filename:
-            with open(filename, "w") as f:
-                yaml.dump(data, f, default_flow_style=False)
-            print("Saved current path:", filename)
+            self.saveYamlFile(filename, data, "Saved current path:")
+
+    def saveYamlFile(self, filename, data, message):
+        """Write data to a YAML file in the background; message is printed with the filename when done."""
+        task = YamlSaveTask(filename, data, message)
+        task.signals.finished.connect(self.onYamlSaved)
+        task.signals.failed.connect(self.onYamlSaveFailed)
+        QThreadPool.globalInstance().start(task)
+
+    @pyqtSlot(object)
+    def onYamlSaved(self, result):
+        message, filename = result
+        print(message, filename)
+
+    @pyqtSlot(str)
+    def onYamlSaveFailed(self, error):
+        print("Failed to save YAML:", error)
 
     def togglePOI(self):
         """Toggle the display of POI labels on the map."""
-        self.webview.page().runJavaScript("togglePOI();")
+        self._page.runJavaScript("togglePOI();")
 
 def main():
     # Start the local HTTP server in a background thread.
@@ -349,7 +654,10 @@ def main():
     app = QApplication(sys.argv)
     window = MapPointSelector()
     window.show()
-    sys.exit(app.exec_())
+    status = app.exec_()
+    # Let background YAML saves finish writing before the interpreter shuts down.
+    QThreadPool.globalInstance().waitForDone()
+    sys.exit(status)
 
 if __name__ == "__main__":
     main()